@@ -27,10 +27,15 @@ source wins more than 98% of the time against 3 random sources.
 """
 
 from abc import ABC, abstractmethod
-from typing import Tuple
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
 
-from apologies.game import Player, PlayerView
-from apologies.rules import BoardRules
+from apologies.game import BOARD_SQUARES, SAFE_SQUARES, Pawn, Player, PlayerColor, PlayerView, Position
+from apologies.rules import ActionType, BoardRules, Move
+
+# A pawn's position is fully described by (color, home, safe, square); start is implied if none are set
+_PawnKey = Tuple[PlayerColor, bool, Optional[int], Optional[int]]
+_PlayerKey = Tuple[_PawnKey, ...]
 
 
 class RewardCalculator(ABC):
@@ -57,34 +62,113 @@ class RewardCalculatorV1(RewardCalculator):
         """Return the range of possible rewards for a game."""
         return 0.0, float((players - 1) * 400)  # reward is up to 400 points per opponent
 
+    def opponent_score(self, view: PlayerView) -> int:
+        """Calculate the combined score of all opponents in a player view, for use as a baseline."""
+        return RewardCalculatorV1._opponent_score(view)
+
+    def calculate_with_baseline(self, view: PlayerView, opponent_score: int) -> float:
+        """
+        Calculate the reward associated with a player view, given a precomputed opponent score.
+
+        This is only valid if the opponents' pawns in the view are positioned exactly as they were
+        when the baseline was computed via opponent_score(), i.e. for a move that touches only the
+        player's own pawns.
+        """
+        reward = (len(view.opponents) * RewardCalculatorV1._player_score(view.player)) - opponent_score
+        return float(0 if reward < 0 else reward)
+
+    def upper_bound(self, view: PlayerView, move: Move, opponent_score: int) -> float:
+        """
+        Calculate an upper bound on the reward associated with a move, without evaluating the move.
+
+        Each action is scored against the position of its pawn in the view, counting only gains for the
+        player's pawns and only losses for opponent pawns.  That way, the bound holds regardless of how a
+        move's actions and side-effects combine.  The opponent score is the baseline from opponent_score().
+        """
+        color = view.player.color
+        gain, loss, homes = 0, 0, set()
+        for action in move.actions + move.side_effects:
+            pawn = view.get_pawn(action.pawn)
+            if pawn:  # evaluation ignores invalid pawns, so we do too
+                before = _pawn_score(_pawn_position_key(pawn))
+                if action.actiontype == ActionType.MOVE_TO_START:
+                    after = 0
+                else:
+                    after = _pawn_score((pawn.color, action.position.home, action.position.safe, action.position.square))
+                if pawn.color == color:
+                    gain += max(0, after - before)
+                    if action.actiontype == ActionType.MOVE_TO_POSITION and action.position.home:
+                        homes.add(pawn.index)
+                else:
+                    loss += max(0, before - after)
+        if all(pawn.position.home or pawn.index in homes for pawn in view.player.pawns):
+            return float(len(view.opponents) * 400)  # the move might win the game
+        reward = (len(view.opponents) * (RewardCalculatorV1._player_score(view.player) + gain)) - (opponent_score - loss)
+        return float(0 if reward < 0 else reward)
+
     @staticmethod
     def _reward(view: PlayerView) -> int:
         # Reward measures this player's overall game position relative to their opponents
         player_score = RewardCalculatorV1._player_score(view.player)
-        opponent_scores = [RewardCalculatorV1._player_score(player) for player in view.opponents.values()]
-        reward = (len(view.opponents) * player_score) - sum(opponent_scores)
+        opponent_score = RewardCalculatorV1._opponent_score(view)
+        reward = (len(view.opponents) * player_score) - opponent_score
         return 0 if reward < 0 else reward
 
     @staticmethod
-    def _player_score(player: Player) -> int:
-        # There are 3 different incentives, designed to encourage the right behavior
-        distance_incentive = RewardCalculatorV1._distance_incentive(player)
-        safe_incentive = RewardCalculatorV1._safe_incentive(player)
-        winner_incentive = RewardCalculatorV1._winner_incentive(player)
-        return distance_incentive + safe_incentive + winner_incentive
+    def _opponent_score(view: PlayerView) -> int:
+        # Combined score of all opponents, shared by _reward() and the opponent_score() baseline
+        opponent_score = 0
+        for player in view.opponents.values():
+            opponent_score += RewardCalculatorV1._player_score(player)
+        return opponent_score
 
     @staticmethod
-    def _distance_incentive(player: Player) -> int:
-        # Incentive of 1 point for each square closer to home for each of the player's 4 pawns
-        distance = sum([BoardRules.distance_to_home(pawn) for pawn in player.pawns])
-        return 260 - distance  # 260 = 4*65, max distance for 4 pawns
+    def _player_score(player: Player) -> int:
+        # Scores are a pure function of pawn positions, so identical layouts are only scored once
+        return _player_score_cached(_pawn_key(player))
 
-    @staticmethod
-    def _safe_incentive(player: Player) -> int:
-        # Incentive of 10 points for each pawn in safe or home
-        return sum([10 if pawn.position.home or pawn.position.safe is not None else 0 for pawn in player.pawns])
 
-    @staticmethod
-    def _winner_incentive(player: Player) -> int:
-        # Incentive of 100 points for winning the game
-        return 100 if player.all_pawns_in_home() else 0
+def _pawn_key(player: Player) -> _PlayerKey:
+    """Build a hashable key describing the position of each of a player's pawns."""
+    p0, p1, p2, p3 = player.pawns
+    return _pawn_position_key(p0), _pawn_position_key(p1), _pawn_position_key(p2), _pawn_position_key(p3)
+
+
+def _pawn_position_key(pawn: Pawn) -> _PawnKey:
+    """Build a hashable key describing the position of a single pawn."""
+    return pawn.color, pawn.position.home, pawn.position.safe, pawn.position.square
+
+
+def _pawn_score(key: _PawnKey) -> int:
+    """The distance and safe incentives contributed by a single pawn, which is zero for a pawn in start."""
+    return 65 - _DISTANCE[key] + (10 if key[1] or key[2] is not None else 0)
+
+
+def _distance_table() -> Dict[_PawnKey, int]:
+    """Build a table of the distance to home for every possible position of every color of pawn."""
+    table: Dict[_PawnKey, int] = {}
+    for color in PlayerColor:
+        pawn = Pawn(color, 0)
+        positions = [Position().move_to_start(), Position().move_to_home()]
+        positions += [Position().move_to_safe(safe) for safe in range(SAFE_SQUARES)]
+        positions += [Position().move_to_square(square) for square in range(BOARD_SQUARES)]
+        for position in positions:
+            pawn.position = position
+            table[(color, position.home, position.safe, position.square)] = BoardRules.distance_to_home(pawn)
+    return table
+
+
+# There are only a few hundred distinct pawn positions, so distance to home is a table lookup
+_DISTANCE = _distance_table()
+
+
+@lru_cache(maxsize=4096)
+def _player_score_cached(key: _PlayerKey) -> int:
+    """Score a player's pawn layout; there are 3 different incentives, designed to encourage the right behavior."""
+    p0, p1, p2, p3 = key  # each pawn key is (color, home, safe, square), so [1] is home and [2] is safe
+    distance = _DISTANCE[p0] + _DISTANCE[p1] + _DISTANCE[p2] + _DISTANCE[p3]
+    safe = (p0[1] or p0[2] is not None) + (p1[1] or p1[2] is not None) + (p2[1] or p2[2] is not None) + (p3[1] or p3[2] is not None)
+    distance_incentive = 260 - distance  # 1 point for each square closer to home for each pawn; 260 = 4*65, max distance
+    safe_incentive = 10 * safe  # 10 points for each pawn in safe or home
+    winner_incentive = 100 if p0[1] and p1[1] and p2[1] and p3[1] else 0  # 100 points for winning the game
+    return distance_incentive + safe_incentive + winner_incentive
@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
 # vim: set ft=python ts=4 sw=4 expandtab:
+# pylint: disable=protected-access
 
-from apologies.game import Game, PlayerColor
-from apologies.reward import RewardCalculatorV1
+from apologies.game import BOARD_SQUARES, SAFE_SQUARES, Card, CardType, Game, GameMode, PlayerColor
+from apologies.reward import _DISTANCE, RewardCalculatorV1, _pawn_key, _player_score_cached
+from apologies.rules import Rules
 
 
 class TestRewardCalculatorV1:
@@ -109,3 +111,72 @@ class TestRewardCalculatorV1:
 
         view = game.create_player_view(PlayerColor.BLUE)
         assert RewardCalculatorV1().calculate(view) == 0
+
+    def test_player_score_cached(self):
+        game = Game(playercount=2)
+        game.players[PlayerColor.RED].pawns[0].position.move_to_safe(4)
+        copy = game.players[PlayerColor.RED].copy()
+        assert _pawn_key(copy) == _pawn_key(game.players[PlayerColor.RED])  # keys are value-equal across copies
+        _player_score_cached.cache_clear()
+        assert RewardCalculatorV1._player_score(game.players[PlayerColor.RED]) == 74
+        assert RewardCalculatorV1._player_score(copy) == 74
+        assert _player_score_cached.cache_info().hits == 1
+
+    def test_distance_table(self):
+        assert len(_DISTANCE) == len(PlayerColor) * (2 + SAFE_SQUARES + BOARD_SQUARES)  # start, home, safe and board squares
+        assert _DISTANCE[(PlayerColor.RED, False, None, None)] == 65  # start
+        assert _DISTANCE[(PlayerColor.RED, True, None, None)] == 0  # home
+        assert _DISTANCE[(PlayerColor.RED, False, 0, None)] == 5  # first safe square
+        assert _DISTANCE[(PlayerColor.RED, False, 4, None)] == 1  # last safe square
+        assert _DISTANCE[(PlayerColor.RED, False, None, 4)] == 64  # circle
+        assert _DISTANCE[(PlayerColor.RED, False, None, 3)] == 65  # just behind the circle, the whole way around
+        assert _DISTANCE[(PlayerColor.RED, False, None, 2)] == 6  # turn square
+        assert _DISTANCE[(PlayerColor.RED, False, None, 1)] == 7  # just before the turn square
+        assert _DISTANCE[(PlayerColor.RED, False, None, 59)] == 9  # last square before the corner
+        assert _DISTANCE[(PlayerColor.BLUE, False, None, 19)] == 64  # circle
+        assert _DISTANCE[(PlayerColor.BLUE, False, None, 17)] == 6  # turn square
+        assert _DISTANCE[(PlayerColor.BLUE, False, None, 0)] == 23  # across the corner from the turn square
+
+    def test_calculate_with_baseline(self):
+        game = Game(playercount=4)
+        game.players[PlayerColor.RED].pawns[0].position.move_to_safe(4)
+        game.players[PlayerColor.YELLOW].pawns[0].position.move_to_square(34)
+        for color in PlayerColor:
+            view = game.create_player_view(color)
+            baseline = RewardCalculatorV1().opponent_score(view)
+            assert RewardCalculatorV1().calculate_with_baseline(view, baseline) == RewardCalculatorV1().calculate(view)
+
+    def test_winner_opponents_not_in_start(self):
+        game = Game(playercount=3)
+        for pawn in game.players[PlayerColor.RED].pawns:
+            pawn.position.move_to_home()
+        game.players[PlayerColor.YELLOW].pawns[0].position.move_to_safe(4)
+        game.players[PlayerColor.GREEN].pawns[0].position.move_to_square(2)
+        view = game.create_player_view(PlayerColor.RED)
+        assert RewardCalculatorV1().calculate(view) == 712  # a winner still loses points for opponents that left start
+        assert RewardCalculatorV1().calculate_with_baseline(view, RewardCalculatorV1().opponent_score(view)) == 712
+
+    def test_upper_bound(self):
+        game = Game(playercount=4)
+        game.players[PlayerColor.RED].pawns[0].position.move_to_square(4)
+        game.players[PlayerColor.RED].pawns[1].position.move_to_safe(3)
+        game.players[PlayerColor.YELLOW].pawns[0].position.move_to_square(34)
+        game.players[PlayerColor.GREEN].pawns[0].position.move_to_square(9)
+        game.players[PlayerColor.BLUE].pawns[0].position.move_to_square(7)
+        view = game.create_player_view(PlayerColor.RED)
+        baseline = RewardCalculatorV1().opponent_score(view)
+        for cardtype in CardType:
+            for move in Rules(GameMode.STANDARD).construct_legal_moves(view, card=Card("x", cardtype)):
+                bound = RewardCalculatorV1().upper_bound(view, move, baseline)
+                assert bound >= RewardCalculatorV1().calculate(Rules.evaluate_move(view, move))
+
+    def test_upper_bound_winner(self):
+        game = Game(playercount=2)
+        game.players[PlayerColor.RED].pawns[0].position.move_to_home()
+        game.players[PlayerColor.RED].pawns[1].position.move_to_home()
+        game.players[PlayerColor.RED].pawns[2].position.move_to_home()
+        game.players[PlayerColor.RED].pawns[3].position.move_to_safe(4)
+        view = game.create_player_view(PlayerColor.RED)
+        baseline = RewardCalculatorV1().opponent_score(view)
+        move = Rules(GameMode.STANDARD).construct_legal_moves(view, card=Card("x", CardType.CARD_1))[0]
+        assert RewardCalculatorV1().upper_bound(view, move, baseline) == 400  # moving the last pawn home wins the game
@@ -3,12 +3,13 @@
 # pylint: disable=redefined-outer-name,protected-access,broad-except
 # Unit tests for source.py
 
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, call, patch
 
 import pytest
 
-from apologies.game import GameMode
+from apologies.game import Card, CardType, Game, GameMode, Pawn, PlayerColor
 from apologies.reward import RewardCalculatorV1
+from apologies.rules import Rules
 from apologies.source import NoOpInputSource, RandomInputSource, RewardV1InputSource, source
 
 
@@ -28,12 +29,24 @@ class TestFunctions:
         ris = source("RandomInputSource")
         assert isinstance(ris, RandomInputSource)  # if there's no module, we assume "apologies.source"
 
+        ris = source("RewardV1InputSource")
+        assert isinstance(ris, RewardV1InputSource)
+
+    def test_source_located(self):
+        with patch("apologies.source.locate") as locate:
+            locate.return_value = RandomInputSource
+            assert isinstance(source("RandomInputSource"), RandomInputSource)
+            locate.assert_not_called()  # known sources come from the registry
+            assert isinstance(source("tests.test_source.Other"), RandomInputSource)
+            locate.assert_called_once_with("tests.test_source.Other")  # anything else is located by name
+
 
 class TestNoOpInputSource:
     def test_constructor(self):
         nois = NoOpInputSource()  # the contract says there must be a valid zero-args constructor
         assert nois.name == "NoOpInputSource"
         assert nois.fullname == "apologies.source.NoOpInputSource"
+        assert not hasattr(nois, "__dict__")  # stateless, so there's no need for a per-instance dict
 
     def test_choose_move(self):
         with pytest.raises(NotImplementedError):
@@ -45,6 +58,7 @@ class TestRandomInputSource:
         ris = RandomInputSource()  # the contract says there must be a valid zero-args constructor
         assert ris.name == "RandomInputSource"
         assert ris.fullname == "apologies.source.RandomInputSource"
+        assert not hasattr(ris, "__dict__")  # stateless, so there's no need for a per-instance dict
 
     def test_choose_move(self):
         move1 = MagicMock()
@@ -55,6 +69,12 @@ class TestRandomInputSource:
         for _ in range(100):
             assert ris.choose_move(GameMode.ADULT, MagicMock(), legal_moves, MagicMock()) in legal_moves
 
+    def test_choose_move_all(self):
+        legal_moves = [MagicMock(), MagicMock(), MagicMock()]
+        ris = RandomInputSource()
+        chosen = {id(ris.choose_move(GameMode.ADULT, MagicMock(), legal_moves, MagicMock())) for _ in range(1000)}
+        assert chosen == {id(move) for move in legal_moves}  # every legal move can be chosen
+
 
 class TestRewardV1InputSource:
     def test_constructor(self):
@@ -66,14 +86,141 @@ class TestRewardV1InputSource:
     def test_choose_move(self):
         view = MagicMock()
 
-        move1 = MagicMock()
-        move2 = MagicMock()
-        move3 = MagicMock()
+        move1 = MagicMock(actions=[], side_effects=[])
+        move2 = MagicMock(actions=[], side_effects=[])
+        move3 = MagicMock(actions=[], side_effects=[])
         legal_moves = [move1, move2, move3]
 
         ris = RewardV1InputSource()
+        ris.calculator = _calculator(calculate_with_baseline=[200, 300, 100])
+        evaluator = MagicMock(side_effect=[1, 2, 3])
+
+        assert ris.choose_move(GameMode.ADULT, view, legal_moves, evaluator) is move2
+        ris.calculator.opponent_score.assert_called_once_with(view)  # baseline is computed once per turn
+        ris.calculator.calculate_with_baseline.assert_has_calls([call(1, 50), call(2, 50), call(3, 50)])
+        ris.calculator.calculate.assert_not_called()
 
-        ris.calculator.calculate = MagicMock(side_effect=[200, 300, 100])
+    def test_choose_move_tie(self):
+        view = MagicMock()
+
+        move1 = MagicMock(actions=[], side_effects=[])
+        move2 = MagicMock(actions=[], side_effects=[])
+        move3 = MagicMock(actions=[], side_effects=[])
+        legal_moves = [move1, move2, move3]
+
+        ris = RewardV1InputSource()
+        ris.calculator = _calculator(calculate_with_baseline=[100, 300, 300])
         evaluator = MagicMock(side_effect=[1, 2, 3])
 
+        assert ris.choose_move(GameMode.ADULT, view, legal_moves, evaluator) is move2  # first of the tied moves wins
+
+    def test_choose_move_bumps_opponent(self):
+        view = MagicMock()
+        view.player.color = PlayerColor.RED
+
+        move1 = MagicMock(actions=[MagicMock(pawn=Pawn(PlayerColor.RED, 0))], side_effects=[])
+        move2 = MagicMock(
+            actions=[MagicMock(pawn=Pawn(PlayerColor.RED, 0))], side_effects=[MagicMock(pawn=Pawn(PlayerColor.BLUE, 0))]
+        )
+        legal_moves = [move1, move2]
+
+        ris = RewardV1InputSource()
+        ris.calculator = _calculator(calculate_with_baseline=[200], calculate=[300])  # baseline is stale once an opponent moves
+        evaluator = MagicMock(side_effect=[1, 2])
+
+        assert ris.choose_move(GameMode.ADULT, view, legal_moves, evaluator) is move2
+        ris.calculator.calculate_with_baseline.assert_called_once_with(1, 50)
+        ris.calculator.calculate.assert_called_once_with(2)
+
+    def test_choose_move_bumps_opponent_uses_calculate(self):
+        view = MagicMock()
+        view.player.color = PlayerColor.RED
+
+        move1 = MagicMock(
+            actions=[MagicMock(pawn=Pawn(PlayerColor.RED, 0))], side_effects=[MagicMock(pawn=Pawn(PlayerColor.BLUE, 0))]
+        )
+        legal_moves = [move1]
+
+        ris = RewardV1InputSource()
+        ris.calculator = _calculator()
+        ris.calculate = MagicMock(return_value=(move1, 300))  # e.g. a subclass that overrides calculate()
+        evaluator = MagicMock()
+
+        assert ris.choose_move(GameMode.ADULT, view, legal_moves, evaluator) is move1
+        ris.calculate.assert_called_once_with(view, move1, evaluator)
+
+    def test_choose_move_pruned(self):
+        view = MagicMock()
+
+        move1 = MagicMock(actions=[], side_effects=[])
+        move2 = MagicMock(actions=[], side_effects=[])
+        move3 = MagicMock(actions=[], side_effects=[])
+        move4 = MagicMock(actions=[], side_effects=[])
+        legal_moves = [move1, move2, move3, move4]
+
+        ris = RewardV1InputSource()
+        ris.calculator = _calculator(upper_bound=[100.0, 300.0, 250.0, 300.0], calculate_with_baseline=[250, 250])
+        evaluator = MagicMock(side_effect=[2, 3])
+
+        # move2 and move4 are evaluated (best bounds first) and tie, so the earlier move2 wins
+        # move3 could at best tie move2, and move1 can't possibly beat it, so neither is evaluated
         assert ris.choose_move(GameMode.ADULT, view, legal_moves, evaluator) is move2
+        evaluator.assert_has_calls([call(view, move2), call(view, move4)])
+        assert evaluator.call_count == 2
+
+    def test_choose_move_pruned_tie(self):
+        view = MagicMock()
+
+        move1 = MagicMock(actions=[], side_effects=[])
+        move2 = MagicMock(actions=[], side_effects=[])
+        legal_moves = [move1, move2]
+
+        ris = RewardV1InputSource()
+        ris.calculator = _calculator(upper_bound=[250.0, 300.0], calculate_with_baseline=[250, 250])
+        evaluator = MagicMock(side_effect=[2, 1])
+
+        # move2 has the better bound so it's evaluated first, but move1 ties it and is the earlier legal move
+        assert ris.choose_move(GameMode.ADULT, view, legal_moves, evaluator) is move1
+        evaluator.assert_has_calls([call(view, move2), call(view, move1)])
+
+    def test_choose_move_real_positions(self):
+        game = Game(playercount=4)
+        game.players[PlayerColor.RED].pawns[0].position.move_to_square(4)
+        game.players[PlayerColor.RED].pawns[1].position.move_to_square(10)
+        game.players[PlayerColor.RED].pawns[2].position.move_to_safe(2)
+        game.players[PlayerColor.YELLOW].pawns[0].position.move_to_square(34)
+        game.players[PlayerColor.GREEN].pawns[0].position.move_to_square(9)
+        game.players[PlayerColor.GREEN].pawns[1].position.move_to_square(14)
+        game.players[PlayerColor.BLUE].pawns[0].position.move_to_square(7)
+        game.players[PlayerColor.BLUE].pawns[1].position.move_to_square(12)
+        self._check_real_position(game.create_player_view(PlayerColor.RED))
+
+    def test_choose_move_real_positions_tied(self):
+        game = Game(playercount=3)
+        game.players[PlayerColor.RED].pawns[3].position.move_to_square(20)
+        game.players[PlayerColor.GREEN].pawns[0].position.move_to_square(4)  # any red pawn leaving start bumps this pawn
+        self._check_real_position(game.create_player_view(PlayerColor.RED))
+
+    @staticmethod
+    def _check_real_position(view):
+        # Pruning must never change the result: the chosen move is the first legal move with the best reward
+        rules = Rules(GameMode.ADULT)
+        calculator = RewardCalculatorV1()
+        ris = RewardV1InputSource()
+        everything = []
+        for cardtype in CardType:
+            legal_moves = rules.construct_legal_moves(view, card=Card("x", cardtype))
+            everything += legal_moves
+            for moves in [legal_moves, list(reversed(legal_moves)), everything]:
+                expected = max(moves, key=lambda m: calculator.calculate(Rules.evaluate_move(view, m)))
+                assert ris.choose_move(GameMode.ADULT, view, moves, Rules.evaluate_move) is expected
+
+
+def _calculator(upper_bound=None, calculate_with_baseline=None, calculate=None):
+    """Mock calculator with an opponent baseline of 50, which never prunes unless upper bounds are provided."""
+    calculator = MagicMock()
+    calculator.opponent_score = MagicMock(return_value=50)
+    calculator.upper_bound = MagicMock(side_effect=upper_bound) if upper_bound else MagicMock(return_value=1200.0)
+    calculator.calculate_with_baseline = MagicMock(side_effect=calculate_with_baseline)
+    calculator.calculate = MagicMock(side_effect=calculate)
+    return calculator